@@ -57,6 +57,21 @@ def main():
         help='Random seed for reproducibility (default: 42)'
     )
 
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Number of worker processes for tick generation (default: CPU count)'
+    )
+
+    parser.add_argument(
+        '--format',
+        type=str,
+        choices=['csv', 'parquet'],
+        default='csv',
+        help='File format for tick data (default: csv, read by the Java simulator)'
+    )
+
     args = parser.parse_args()
 
     tick_config = {
@@ -69,7 +84,9 @@ def main():
         output_dir=args.output,
         num_tickers=args.tickers,
         days=args.days,
-        tick_config=tick_config
+        tick_config=tick_config,
+        max_workers=args.workers,
+        tick_format=args.format
     )
 
     pipeline.run()
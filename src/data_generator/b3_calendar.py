@@ -0,0 +1,31 @@
+"""
+B3 trading calendar.
+"""
+
+from pandas.tseries.holiday import AbstractHolidayCalendar, Holiday, GoodFriday, Easter
+from pandas.tseries.offsets import CustomBusinessDay, Day
+
+
+class B3HolidayCalendar(AbstractHolidayCalendar):
+    """Days the B3 exchange is closed: national holidays plus Dec 24 and Dec 31."""
+
+    rules = [
+        Holiday("Confraternização Universal", month=1, day=1),
+        Holiday("Carnaval (segunda)", month=1, day=1, offset=[Easter(), Day(-48)]),
+        Holiday("Carnaval (terça)", month=1, day=1, offset=[Easter(), Day(-47)]),
+        GoodFriday,
+        Holiday("Tiradentes", month=4, day=21),
+        Holiday("Dia do Trabalho", month=5, day=1),
+        Holiday("Corpus Christi", month=1, day=1, offset=[Easter(), Day(60)]),
+        Holiday("Independência", month=9, day=7),
+        Holiday("Nossa Senhora Aparecida", month=10, day=12),
+        Holiday("Finados", month=11, day=2),
+        Holiday("Proclamação da República", month=11, day=15),
+        Holiday("Consciência Negra", month=11, day=20, start_date="2024-01-01"),
+        Holiday("Véspera de Natal", month=12, day=24),
+        Holiday("Natal", month=12, day=25),
+        Holiday("Último dia do ano", month=12, day=31),
+    ]
+
+
+B3_BUSINESS_DAY = CustomBusinessDay(calendar=B3HolidayCalendar())
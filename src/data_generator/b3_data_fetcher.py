@@ -5,10 +5,47 @@ B3 Historical Data Fetcher - Download and parse COTAHIST files.
 import os
 import requests
 import zipfile
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
+from functools import lru_cache
+
+
+COLSPECS = {
+    'tipreg': (0, 2),
+    'date': (2, 10),
+    'codbdi': (10, 12),
+    'codneg': (12, 24),
+    'tpmerc': (24, 27),
+    'nomres': (27, 39),
+    'preabe': (56, 69),
+    'premax': (69, 82),
+    'premin': (82, 95),
+    'premed': (95, 108),
+    'preult': (108, 121),
+    'totneg': (147, 152),
+    'quatot': (152, 170),
+    'voltot': (170, 188),
+}
+
+INT_FIELDS = ['date', 'totneg', 'quatot', 'voltot']
+PRICE_FIELDS = ['preabe', 'premax', 'premin', 'premed', 'preult']
+STR_FIELDS = ['codbdi', 'codneg', 'tpmerc', 'nomres']
+
+STATS_FIELDS = [
+    'totneg', 'quatot', 'voltot',
+    'preabe', 'premax', 'premin', 'premed', 'preult'
+]
+
+LOAD_COLUMNS = ['codneg', 'date'] + STATS_FIELDS
+
+CHUNK_SIZE = 200_000
+
+DOWNLOAD_BLOCK_SIZE = 1 << 20
 
 
 class B3HistoricalDataFetcher:
@@ -36,10 +73,35 @@ class B3HistoricalDataFetcher:
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.parsed_dir.mkdir(exist_ok=True)
 
+        self.session = requests.Session()
+
+        self._year_cache: Dict[int, pd.DataFrame] = {}
+        self._index: Dict[int, pd.Series] = {}
+        self._stats_cache: Dict[Tuple[str, str], Optional[Dict]] = {}
+
     def get_ticker_stats(self, ticker: str, date: str) -> Optional[Dict]:
         """
         Get statistics for a ticker on a specific date from COTAHIST.
 
+        Results are memoized per (ticker, date).
+
+        Args:
+            ticker: Ticker symbol (without .SA suffix)
+            date: Date in format YYYY-MM-DD
+
+        Returns:
+            Dict with ticker statistics or None if not found
+        """
+        key = (ticker, date)
+        if key not in self._stats_cache:
+            self._stats_cache[key] = self._lookup_ticker_stats(ticker, date)
+
+        return self._stats_cache[key]
+
+    def _lookup_ticker_stats(self, ticker: str, date: str) -> Optional[Dict]:
+        """
+        Look up statistics for a ticker on a specific date in COTAHIST.
+
         Args:
             ticker: Ticker symbol (without .SA suffix)
             date: Date in format YYYY-MM-DD
@@ -47,8 +109,7 @@ class B3HistoricalDataFetcher:
         Returns:
             Dict with ticker statistics or None if not found
         """
-        date_obj = datetime.strptime(date, "%Y-%m-%d")
-        year = date_obj.year
+        year, date_int = _date_key(date)
 
         df = self.load_cotahist(year)
 
@@ -56,44 +117,80 @@ class B3HistoricalDataFetcher:
             return None
 
         ticker_clean = ticker.replace(".SA", "")
-        date_int = int(date_obj.strftime("%Y%m%d"))
 
-        mask = (df['codneg'] == ticker_clean) & (df['date'] == date_int)
-        records = df[mask]
+        idx = self._year_index(year, df).get((ticker_clean, date_int))
 
-        if records.empty:
+        if idx is None:
             return None
 
-        record = records.iloc[0]
-
-        return {
-            'ticker': ticker,
-            'date': date,
-            'totneg': int(record['totneg']),
-            'quatot': int(record['quatot']),
-            'voltot': float(record['voltot']),
-            'preabe': float(record['preabe']),
-            'premax': float(record['premax']),
-            'premin': float(record['premin']),
-            'premed': float(record['premed']),
-            'preult': float(record['preult'])
-        }
+        return _to_stats(ticker, date, df.iloc[idx])
+
+    def get_bulk_ticker_stats(
+        self,
+        tickers: List[str],
+        dates: List[str]
+    ) -> Dict[Tuple[str, str], Dict]:
+        """
+        Get statistics for every (ticker, date) pair at once.
+
+        Each year's records are filtered once to the requested tickers and
+        dates, instead of one lookup per pair, so the per-row index used by
+        get_ticker_stats() is never built here. Results also fill the
+        get_ticker_stats() memo.
+
+        Args:
+            tickers: Ticker symbols (without .SA suffix)
+            dates: Dates in format YYYY-MM-DD
+
+        Returns:
+            Dict keyed by (ticker, date) for the pairs found in COTAHIST
+        """
+        dates_by_year: Dict[int, Dict[int, str]] = {}
+        for date in dates:
+            year, date_int = _date_key(date)
+            dates_by_year.setdefault(year, {})[date_int] = date
+
+        stats = {}
+
+        for year, year_dates in dates_by_year.items():
+            df = self.load_cotahist(year)
+
+            if df is None:
+                continue
+
+            mask = df['codneg'].isin(tickers) & df['date'].isin(list(year_dates))
+            records = df[mask].drop_duplicates(subset=['codneg', 'date'])
+
+            for record in records.to_dict(orient='records'):
+                date = year_dates[record['date']]
+                stats[(record['codneg'], date)] = _to_stats(record['codneg'], date, record)
+
+        for ticker in tickers:
+            for date in dates:
+                self._stats_cache[(ticker, date)] = stats.get((ticker, date))
+
+        return stats
 
     def load_cotahist(self, year: int) -> Optional[pd.DataFrame]:
         """
         Load COTAHIST data for a year (with caching).
 
+        Only the columns in LOAD_COLUMNS are read back from the cache.
+
         Args:
             year: Year to load
 
         Returns:
             DataFrame with parsed data or None if unavailable
         """
+        if year in self._year_cache:
+            return self._year_cache[year]
+
         parquet_path = self.parsed_dir / f"{year}.parquet"
 
         if parquet_path.exists():
             print(f"Loading cached COTAHIST data for {year}...")
-            return pd.read_parquet(parquet_path, engine='fastparquet')
+            return self._cache_year(year, self._read_parquet(parquet_path))
 
         txt_path = self.cache_dir / f"COTAHIST_A{year}.TXT"
 
@@ -103,18 +200,72 @@ class B3HistoricalDataFetcher:
                 return None
 
         print(f"Parsing COTAHIST data for {year}...")
-        df = self.parse_cotahist(txt_path)
+        if not self.convert_cotahist(txt_path, parquet_path):
+            return None
+
+        print(f"Cached to {parquet_path}")
+        return self._cache_year(year, self._read_parquet(parquet_path))
+
+    def _cache_year(self, year: int, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Keep a loaded year in memory.
 
-        if df is not None:
-            df.to_parquet(parquet_path, engine='fastparquet')
-            print(f"Cached to {parquet_path}")
+        Args:
+            year: Year of the data
+            df: DataFrame with parsed data
 
+        Returns:
+            The same DataFrame
+        """
+        self._year_cache[year] = df
         return df
 
+    def _year_index(self, year: int, df: pd.DataFrame) -> pd.Series:
+        """
+        Row positions of a loaded year keyed by (codneg, date).
+
+        Built on the first single lookup for the year, so get_ticker_stats
+        does a hash lookup instead of scanning the frame. Bulk lookups
+        filter the frame directly and never build it.
+
+        Args:
+            year: Year of the data
+            df: DataFrame with parsed data
+
+        Returns:
+            Series of row positions indexed by (codneg, date), first row per key
+        """
+        if year not in self._index:
+            keys = pd.MultiIndex.from_arrays([df['codneg'], df['date']])
+            first = ~keys.duplicated()
+            self._index[year] = pd.Series(np.flatnonzero(first), index=keys[first])
+
+        return self._index[year]
+
+    def _read_parquet(self, parquet_path: Path) -> pd.DataFrame:
+        """
+        Read the columns used for ticker statistics from a cached year.
+
+        Args:
+            parquet_path: Path to parsed COTAHIST Parquet file
+
+        Returns:
+            DataFrame with codneg, date and statistics columns
+        """
+        return pd.read_parquet(
+            parquet_path,
+            engine='pyarrow',
+            columns=LOAD_COLUMNS,
+            memory_map=True
+        )
+
     def download_cotahist(self, year: int) -> bool:
         """
         Download COTAHIST ZIP file for a year.
 
+        The ZIP is streamed to disk in 1 MiB blocks instead of being
+        buffered in memory.
+
         Args:
             year: Year to download
 
@@ -126,11 +277,13 @@ class B3HistoricalDataFetcher:
         txt_path = self.cache_dir / f"COTAHIST_A{year}.TXT"
 
         try:
-            response = requests.get(zip_url, timeout=60)
-            response.raise_for_status()
+            with self.session.get(zip_url, stream=True, timeout=60) as response:
+                response.raise_for_status()
 
-            with open(zip_path, 'wb') as f:
-                f.write(response.content)
+                # iter_content undoes any Content-Encoding, unlike response.raw
+                with open(zip_path, 'wb') as f:
+                    for block in response.iter_content(DOWNLOAD_BLOCK_SIZE):
+                        f.write(block)
 
             with zipfile.ZipFile(zip_path, 'r') as zip_ref:
                 zip_ref.extractall(self.cache_dir)
@@ -146,69 +299,197 @@ class B3HistoricalDataFetcher:
 
         except Exception as e:
             print(f"Error downloading COTAHIST: {e}")
+            if zip_path.exists():
+                zip_path.unlink()
             return False
 
-    def parse_cotahist(self, file_path: Path) -> Optional[pd.DataFrame]:
+    def convert_cotahist(self, file_path: Path, parquet_path: Path) -> bool:
         """
-        Parse COTAHIST fixed-width TXT file.
+        Parse a COTAHIST TXT file chunk by chunk into a Parquet file.
+
+        Each chunk is written as its own row group, so memory stays bounded
+        by the chunk size rather than by the size of the yearly file.
 
         Args:
             file_path: Path to COTAHIST TXT file
+            parquet_path: Destination Parquet file
 
         Returns:
-            DataFrame with parsed data
+            True if successful, False otherwise
         """
-        colspecs = [
-            (0, 2),       # tipreg
-            (2, 10),      # date
-            (10, 12),     # codbdi
-            (12, 24),     # codneg
-            (24, 27),     # tpmerc
-            (27, 39),     # nomres
-            (56, 69),     # preabe
-            (69, 82),     # premax
-            (82, 95),     # premin
-            (95, 108),    # premed
-            (108, 121),   # preult
-            (147, 152),   # totneg
-            (152, 170),   # quatot
-            (170, 188),   # voltot
-        ]
-
-        names = [
-            'tipreg', 'date', 'codbdi', 'codneg', 'tpmerc', 'nomres',
-            'preabe', 'premax', 'premin', 'premed', 'preult',
-            'totneg', 'quatot', 'voltot'
-        ]
+        writer = None
+        total = 0
 
         try:
-            df = pd.read_fwf(
-                file_path,
-                colspecs=colspecs,
-                names=names,
-                encoding='latin-1'
-            )
+            for df in self.iter_cotahist(file_path):
+                table = pa.Table.from_pandas(df, preserve_index=False)
+
+                if writer is None:
+                    writer = pq.ParquetWriter(parquet_path, table.schema, compression='zstd')
 
-            df = df[df['tipreg'] == 1]
+                writer.write_table(table)
+                total += len(df)
 
-            df['date'] = pd.to_numeric(df['date'], errors='coerce')
-            df['totneg'] = pd.to_numeric(df['totneg'], errors='coerce')
-            df['quatot'] = pd.to_numeric(df['quatot'], errors='coerce')
-            df['voltot'] = pd.to_numeric(df['voltot'], errors='coerce')
+        except Exception as e:
+            print(f"Error parsing COTAHIST: {e}")
+            if writer is not None:
+                writer.close()
+                parquet_path.unlink()
+            return False
 
-            df['preabe'] = pd.to_numeric(df['preabe'], errors='coerce') / 100
-            df['premax'] = pd.to_numeric(df['premax'], errors='coerce') / 100
-            df['premin'] = pd.to_numeric(df['premin'], errors='coerce') / 100
-            df['premed'] = pd.to_numeric(df['premed'], errors='coerce') / 100
-            df['preult'] = pd.to_numeric(df['preult'], errors='coerce') / 100
+        if writer is None:
+            print("Error parsing COTAHIST: no records found")
+            return False
 
-            df = df.dropna(subset=['date', 'codneg', 'totneg'])
+        writer.close()
+        print(f"Parsed {total} records from COTAHIST")
+        return True
 
-            df['codneg'] = df['codneg'].str.strip()
+    def parse_cotahist(self, file_path: Path) -> Optional[pd.DataFrame]:
+        """
+        Parse COTAHIST fixed-width TXT file.
 
-            print(f"Parsed {len(df)} records from COTAHIST")
-            return df
+        Args:
+            file_path: Path to COTAHIST TXT file
 
+        Returns:
+            DataFrame with parsed data
+        """
+        try:
+            chunks = list(self.iter_cotahist(file_path))
         except Exception as e:
             print(f"Error parsing COTAHIST: {e}")
-            return None
\ No newline at end of file
+            return None
+
+        if not chunks:
+            print("Error parsing COTAHIST: no records found")
+            return None
+
+        df = pd.concat(chunks, ignore_index=True)
+
+        print(f"Parsed {len(df)} records from COTAHIST")
+        return df
+
+    def iter_cotahist(
+        self,
+        file_path: Path,
+        chunksize: int = CHUNK_SIZE
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Parse COTAHIST fixed-width TXT file in chunks of records.
+
+        Every record has the same length, so each chunk is viewed as a 2-D
+        byte array and each field is sliced out as a whole column.
+
+        Args:
+            file_path: Path to COTAHIST TXT file
+            chunksize: Number of records per chunk
+
+        Yields:
+            DataFrame with the quote records (tipreg 01) of each chunk
+        """
+        with open(file_path, 'rb') as f:
+            reclen = len(f.readline())
+            if reclen == 0:
+                return
+            f.seek(0)
+
+            while True:
+                buf = f.read(chunksize * reclen)
+                if not buf:
+                    break
+
+                pad = -len(buf) % reclen
+                if pad:
+                    buf += b' ' * pad
+
+                records = np.frombuffer(buf, dtype=np.uint8).reshape(-1, reclen)
+                records = records[_field(records, *COLSPECS['tipreg']) == b'01']
+
+                if len(records):
+                    yield _parse_records(records)
+
+
+def _parse_records(records: np.ndarray) -> pd.DataFrame:
+    """
+    Convert quote records into a DataFrame.
+
+    Numeric fields in COTAHIST are zero-padded, so they convert straight
+    from bytes to integers.
+
+    Args:
+        records: Array of shape (n_records, record_len) with raw bytes
+
+    Returns:
+        DataFrame with one column per COTAHIST field
+    """
+    data = {'tipreg': np.ones(len(records), dtype=np.int64)}
+
+    for name in INT_FIELDS:
+        data[name] = _field(records, *COLSPECS[name]).astype(np.int64)
+
+    for name in PRICE_FIELDS:
+        data[name] = _field(records, *COLSPECS[name]).astype(np.int64) / 100
+
+    for name in STR_FIELDS:
+        data[name] = np.char.strip(
+            np.char.decode(_field(records, *COLSPECS[name]), 'latin-1')
+        )
+
+    return pd.DataFrame(data, columns=list(COLSPECS))
+
+
+def _to_stats(ticker: str, date: str, record) -> Dict:
+    """
+    Build the statistics dict returned for a COTAHIST record.
+
+    Args:
+        ticker: Ticker symbol as requested
+        date: Date in format YYYY-MM-DD
+        record: Row (Series or dict) with the STATS_FIELDS columns
+
+    Returns:
+        Dict with ticker statistics
+    """
+    return {
+        'ticker': ticker,
+        'date': date,
+        'totneg': int(record['totneg']),
+        'quatot': int(record['quatot']),
+        'voltot': float(record['voltot']),
+        'preabe': float(record['preabe']),
+        'premax': float(record['premax']),
+        'premin': float(record['premin']),
+        'premed': float(record['premed']),
+        'preult': float(record['preult'])
+    }
+
+
+@lru_cache(maxsize=None)
+def _date_key(date: str) -> Tuple[int, int]:
+    """
+    Convert a YYYY-MM-DD date string to its COTAHIST keys, memoized across calls.
+
+    Args:
+        date: Date in format YYYY-MM-DD
+
+    Returns:
+        Tuple of (year, date as YYYYMMDD int)
+    """
+    date_obj = datetime.strptime(date, "%Y-%m-%d")
+    return date_obj.year, int(date_obj.strftime("%Y%m%d"))
+
+
+def _field(records: np.ndarray, start: int, end: int) -> np.ndarray:
+    """
+    Slice a fixed-width field out of a 2-D record array.
+
+    Args:
+        records: Array of shape (n_records, record_len) with raw bytes
+        start: First byte of the field
+        end: Byte after the last one of the field
+
+    Returns:
+        1-D bytes array with one entry per record
+    """
+    return np.ascontiguousarray(records[:, start:end]).view(f'S{end - start}').ravel()
@@ -3,27 +3,107 @@ Data organization and file system management for market data.
 """
 
 import os
-import json
+import orjson
 import pandas as pd
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 from datetime import datetime
 
 
+TICK_FORMATS = ('csv', 'parquet')
+
+
+def write_ticks(
+    tickers_dir: Path,
+    ticker: str,
+    date: str,
+    ticks_df: pd.DataFrame,
+    tick_format: str = 'csv'
+) -> Path:
+    """
+    Write tick data for a ticker on a specific date.
+
+    Kept at module level so worker processes can write files without a
+    DataOrganizer instance.
+
+    Args:
+        tickers_dir: Base directory holding one folder per ticker
+        ticker: Ticker symbol
+        date: Date string in format YYYY-MM-DD
+        ticks_df: DataFrame with tick data
+        tick_format: 'csv' (read by the Java simulator) or 'parquet'
+
+    Returns:
+        Path of the written file
+    """
+    ticker_dir = Path(tickers_dir) / ticker
+    ticker_dir.mkdir(exist_ok=True)
+
+    ticks_file = ticker_dir / f"{date}_ticks.{tick_format}"
+
+    if tick_format == 'parquet':
+        ticks_df.to_parquet(ticks_file, engine='pyarrow', compression='zstd', index=False)
+    else:
+        ticks_df.to_csv(ticks_file, index=False)
+
+    return ticks_file
+
+
+def _read_json(path: Path):
+    """
+    Read a JSON file.
+
+    Args:
+        path: Path to JSON file
+
+    Returns:
+        Parsed JSON content
+    """
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+
+def _write_json(path: Path, obj):
+    """
+    Write an object as indented JSON.
+
+    NumPy scalars and arrays (e.g. values taken from DataFrames) are
+    serialized directly.
+
+    Args:
+        path: Destination JSON file
+        obj: Object to serialize
+    """
+    with open(path, 'wb') as f:
+        f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+
+
 class DataOrganizer:
     """Organizes and persists market data in structured directory format."""
 
-    def __init__(self, base_dir: str = "market_data"):
+    RANKING_SUMMARY_SIZE = 20
+
+    def __init__(self, base_dir: str = "market_data", tick_format: str = "csv"):
         """
         Initialize data organizer.
 
         Args:
             base_dir: Base directory for market data storage
+            tick_format: File format for tick data, one of TICK_FORMATS
         """
+        if tick_format not in TICK_FORMATS:
+            raise ValueError(f"Unsupported tick format: {tick_format}")
+
         self.base_dir = Path(base_dir)
+        self.tick_format = tick_format
         self.tickers_dir = self.base_dir / "tickers"
         self.metadata_path = self.base_dir / "metadata.json"
-        self.liquidity_ranking_path = self.base_dir / "liquidity_ranking.json"
+        self.liquidity_ranking_path = self.base_dir / "liquidity_ranking.feather"
+        self.liquidity_summary_path = self.base_dir / "liquidity_ranking.json"
+        self.manifest_path = self.base_dir / "manifest.json"
+
+        self._ticker_info_cache: Dict[str, Dict] = {}
+        self._manifest: Optional[Dict[str, Dict]] = None
 
         self._ensure_directory_structure()
 
@@ -48,51 +128,111 @@ class DataOrganizer:
             ticks_df: DataFrame with tick data
             ticker_info: Optional dict with ticker metadata (liquidity, level, etc)
         """
-        ticker_dir = self.tickers_dir / ticker
-        ticker_dir.mkdir(exist_ok=True)
+        write_ticks(self.tickers_dir, ticker, date, ticks_df, self.tick_format)
+        self.record_ticker_data(ticker, date, len(ticks_df), ticker_info)
 
-        ticks_file = ticker_dir / f"{date}_ticks.csv"
-        ticks_df.to_csv(ticks_file, index=False)
+    def record_ticker_data(
+        self,
+        ticker: str,
+        date: str,
+        num_ticks: int,
+        ticker_info: Dict = None
+    ):
+        """
+        Register tick data already written with write_ticks().
 
+        Args:
+            ticker: Ticker symbol
+            date: Date string in format YYYY-MM-DD
+            num_ticks: Number of ticks written
+            ticker_info: Optional dict with ticker metadata (liquidity, level, etc)
+        """
         if ticker_info:
             self._update_ticker_info(ticker, ticker_info)
 
-        print(f"Saved {ticker} | {date} | {len(ticks_df)} ticks")
+        entry = self._get_manifest().setdefault(ticker, {'dates': [], 'level': None})
+        if date not in entry['dates']:
+            entry['dates'].append(date)
+            entry['dates'].sort()
+        if ticker_info:
+            entry['level'] = ticker_info.get('level')
+
+        print(f"Saved {ticker} | {date} | {num_ticks} ticks")
 
     def _update_ticker_info(self, ticker: str, info: Dict):
         """
-        Update or create ticker_info.json for a ticker.
+        Update ticker info for a ticker in memory.
+
+        Existing ticker_info.json is loaded on first touch; changes are
+        written by flush_ticker_infos().
 
         Args:
             ticker: Ticker symbol
             info: Dict with ticker metadata
         """
-        ticker_dir = self.tickers_dir / ticker
-        info_file = ticker_dir / "ticker_info.json"
+        if ticker not in self._ticker_info_cache:
+            self._ticker_info_cache[ticker] = self._read_ticker_info(ticker) or {}
+
+        self._ticker_info_cache[ticker].update(info)
+
+    def flush_ticker_infos(self):
+        """Write ticker_info.json once for every ticker updated in memory."""
+        for ticker, info in self._ticker_info_cache.items():
+            info_file = self.tickers_dir / ticker / "ticker_info.json"
+
+            _write_json(info_file, info)
+
+    def _get_manifest(self) -> Dict[str, Dict]:
+        """
+        Get the {ticker: {dates, level}} manifest of saved data.
+
+        Loaded from manifest.json on first use. Directories written before
+        the manifest existed are scanned once instead.
+
+        Returns:
+            Dict keyed by ticker symbol
+        """
+        if self._manifest is not None:
+            return self._manifest
 
-        existing_info = {}
-        if info_file.exists():
-            with open(info_file, 'r') as f:
-                existing_info = json.load(f)
+        if self.manifest_path.exists():
+            self._manifest = _read_json(self.manifest_path)
+        else:
+            self._manifest = {}
+            for ticker in self.list_available_tickers():
+                info = self.get_ticker_info(ticker)
+                self._manifest[ticker] = {
+                    'dates': self.list_dates_for_ticker(ticker),
+                    'level': info.get('level') if info else None
+                }
 
-        existing_info.update(info)
+        return self._manifest
 
-        with open(info_file, 'w') as f:
-            json.dump(existing_info, f, indent=2)
+    def flush_manifest(self):
+        """Write manifest.json if it was loaded or updated."""
+        if self._manifest is None:
+            return
+
+        _write_json(self.manifest_path, self._manifest)
 
     def save_liquidity_ranking(self, liquidity_df: pd.DataFrame):
         """
         Save liquidity ranking data.
 
+        The full ranking is stored as Arrow Feather, which keeps dtypes and
+        is what load_liquidity_ranking() reads. liquidity_ranking.json only
+        holds the top RANKING_SUMMARY_SIZE tickers for reading by hand.
+
         Args:
             liquidity_df: DataFrame from LiquidityAnalyzer.analyze_tickers()
         """
-        ranking_data = liquidity_df.to_dict(orient='records')
+        liquidity_df.reset_index(drop=True).to_feather(self.liquidity_ranking_path)
 
-        with open(self.liquidity_ranking_path, 'w') as f:
-            json.dump(ranking_data, f, indent=2)
+        summary_data = liquidity_df.head(self.RANKING_SUMMARY_SIZE).to_dict(orient='records')
 
-        print(f"Saved liquidity ranking: {len(ranking_data)} tickers")
+        _write_json(self.liquidity_summary_path, summary_data)
+
+        print(f"Saved liquidity ranking: {len(liquidity_df)} tickers")
 
     def update_metadata(self, metadata: Dict):
         """
@@ -103,14 +243,12 @@ class DataOrganizer:
         """
         existing_metadata = {}
         if self.metadata_path.exists():
-            with open(self.metadata_path, 'r') as f:
-                existing_metadata = json.load(f)
+            existing_metadata = _read_json(self.metadata_path)
 
         existing_metadata.update(metadata)
         existing_metadata['last_updated'] = datetime.now().isoformat()
 
-        with open(self.metadata_path, 'w') as f:
-            json.dump(existing_metadata, f, indent=2)
+        _write_json(self.metadata_path, existing_metadata)
 
     def list_available_tickers(self) -> List[str]:
         """
@@ -139,13 +277,28 @@ class DataOrganizer:
         if not ticker_dir.exists():
             return []
 
-        csv_files = ticker_dir.glob("*_ticks.csv")
-        dates = [f.stem.replace("_ticks", "") for f in csv_files]
+        tick_files = ticker_dir.glob(f"*_ticks.{self.tick_format}")
+        dates = [f.stem.replace("_ticks", "") for f in tick_files]
         return sorted(dates)
 
     def get_ticker_info(self, ticker: str) -> Dict:
         """
-        Load ticker info from ticker_info.json.
+        Load ticker info, including updates not yet flushed to ticker_info.json.
+
+        Args:
+            ticker: Ticker symbol
+
+        Returns:
+            Dict with ticker info or None if not found
+        """
+        if ticker in self._ticker_info_cache:
+            return self._ticker_info_cache[ticker]
+
+        return self._read_ticker_info(ticker)
+
+    def _read_ticker_info(self, ticker: str) -> Dict:
+        """
+        Read ticker_info.json from disk.
 
         Args:
             ticker: Ticker symbol
@@ -158,8 +311,7 @@ class DataOrganizer:
         if not info_file.exists():
             return None
 
-        with open(info_file, 'r') as f:
-            return json.load(f)
+        return _read_json(info_file)
 
     def load_liquidity_ranking(self) -> pd.DataFrame:
         """
@@ -168,36 +320,35 @@ class DataOrganizer:
         Returns:
             DataFrame with liquidity ranking or None if not found
         """
-        if not self.liquidity_ranking_path.exists():
+        if self.liquidity_ranking_path.exists():
+            return pd.read_feather(self.liquidity_ranking_path)
+
+        if not self.liquidity_summary_path.exists():
             return None
 
-        with open(self.liquidity_ranking_path, 'r') as f:
-            data = json.load(f)
+        data = _read_json(self.liquidity_summary_path)
 
         return pd.DataFrame(data)
 
     def get_summary(self) -> Dict:
         """
-        Get summary of available data.
+        Get summary of available data from the manifest.
 
         Returns:
             Dict with summary statistics
         """
-        tickers = self.list_available_tickers()
+        manifest = self._get_manifest()
 
         summary = {
-            'total_tickers': len(tickers),
+            'total_tickers': len(manifest),
             'tickers': {}
         }
 
-        for ticker in tickers:
-            dates = self.list_dates_for_ticker(ticker)
-            info = self.get_ticker_info(ticker)
-
+        for ticker, entry in manifest.items():
             summary['tickers'][ticker] = {
-                'num_dates': len(dates),
-                'dates': dates,
-                'liquidity_level': info.get('level') if info else None
+                'num_dates': len(entry['dates']),
+                'dates': entry['dates'],
+                'liquidity_level': entry['level']
             }
 
         return summary
\ No newline at end of file
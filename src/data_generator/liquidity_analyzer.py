@@ -49,24 +49,27 @@ class LiquidityAnalyzer:
 
         print("\nCalculating liquidity metrics...")
 
-        liquidity_data = []
-
-        for ticker in tickers:
-            try:
-                liquidity_info = self._calculate_ticker_liquidity(ticker, bulk_data)
-                if liquidity_info:
-                    liquidity_data.append(liquidity_info)
-                    print(f"  {ticker:12} | "
-                          f"Vol: {liquidity_info['avg_volume']:>12,.0f} | "
-                          f"Price: ${liquidity_info['avg_price']:>8.2f} | "
-                          f"Liquidity: ${liquidity_info['liquidity']:>15,.0f}")
-            except Exception as e:
-                print(f"  {ticker:12} | Error: {str(e)[:50]}")
-
-        if not liquidity_data:
+        if isinstance(bulk_data.columns, pd.MultiIndex):
+            df = self._calculate_liquidity(bulk_data)
+        else:
+            liquidity_info = self._calculate_ticker_liquidity(tickers[0], bulk_data)
+            df = pd.DataFrame([liquidity_info] if liquidity_info else [])
+
+        if df.empty:
             raise RuntimeError("No valid liquidity data collected")
 
-        df = pd.DataFrame(liquidity_data)
+        print("\n".join(
+            f"  {row.ticker:12} | "
+            f"Vol: {row.avg_volume:>12,.0f} | "
+            f"Price: ${row.avg_price:>8.2f} | "
+            f"Liquidity: ${row.liquidity:>15,.0f}"
+            for row in df.itertuples(index=False)
+        ))
+
+        skipped = len(tickers) - len(df)
+        if skipped:
+            print(f"  Skipped {skipped} tickers with insufficient data")
+
         df = df.sort_values('liquidity', ascending=False).reset_index(drop=True)
 
         df['percentile'] = df['liquidity'].rank(pct=True) * 100
@@ -75,11 +78,43 @@ class LiquidityAnalyzer:
         print(f"\nLiquidity analysis complete: {len(df)} tickers")
         return df
 
+    def _calculate_liquidity(self, bulk_data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Calculate liquidity metrics for all tickers at once.
+
+        Close and Volume are taken as (days x tickers) matrices, so the
+        averages are column-wise reductions instead of a loop per ticker.
+
+        Args:
+            bulk_data: DataFrame with bulk downloaded data, columns (ticker, field)
+
+        Returns:
+            DataFrame with columns: ticker, avg_volume, avg_price, liquidity
+        """
+        close = bulk_data.xs('Close', axis=1, level=1)
+        volume = bulk_data.xs('Volume', axis=1, level=1)[close.columns]
+
+        mask = close.notna() & volume.notna()
+        close = close.where(mask)
+        volume = volume.where(mask)
+
+        df = pd.DataFrame({
+            'ticker': close.columns.to_numpy(),
+            'avg_volume': volume.mean().to_numpy(),
+            'avg_price': close.mean().to_numpy(),
+            'liquidity': (close * volume).mean().to_numpy()
+        })
+
+        return df[(mask.sum() >= 5).to_numpy()].reset_index(drop=True)
+
     def _calculate_ticker_liquidity(self, ticker: str, bulk_data: pd.DataFrame) -> Dict:
         """
         Calculate liquidity metrics for a single ticker from bulk downloaded data.
         Liquidity = Average(Daily Volume × Average Price)
 
+        Used when the download has a single level of columns (one ticker);
+        multi-ticker downloads go through _calculate_liquidity().
+
         Args:
             ticker: Ticker symbol
             bulk_data: DataFrame with bulk downloaded data for all tickers
@@ -87,10 +122,7 @@ class LiquidityAnalyzer:
         Returns:
             Dict with liquidity metrics or None if insufficient data
         """
-        if len(bulk_data.columns.levels[0]) > 1:
-            ticker_data = bulk_data[ticker]
-        else:
-            ticker_data = bulk_data
+        ticker_data = bulk_data
 
         if ticker_data.empty or len(ticker_data) < 5:
             return None
@@ -103,8 +135,7 @@ class LiquidityAnalyzer:
         avg_price = ticker_data['Close'].mean()
         avg_volume = ticker_data['Volume'].mean()
 
-        ticker_data['dollar_volume'] = ticker_data['Volume'] * ticker_data['Close']
-        liquidity = ticker_data['dollar_volume'].mean()
+        liquidity = float((ticker_data['Volume'].to_numpy() * ticker_data['Close'].to_numpy()).mean())
 
         return {
             'ticker': ticker,
@@ -131,9 +162,9 @@ class LiquidityAnalyzer:
             List of selected ticker symbols
         """
         if exclude_tickers:
-            df = liquidity_df[~liquidity_df['ticker'].isin(exclude_tickers)].copy()
+            df = liquidity_df[~liquidity_df['ticker'].isin(exclude_tickers)]
         else:
-            df = liquidity_df.copy()
+            df = liquidity_df
 
         if len(df) < num_tickers:
             print(f"Warning: Only {len(df)} tickers available, selecting all")
@@ -141,24 +172,84 @@ class LiquidityAnalyzer:
 
         percentiles = np.linspace(10, 90, num_tickers)
 
-        selected = []
+        tickers = df['ticker'].to_numpy()
+        pcts = df['percentile'].to_numpy()
+        order = np.argsort(pcts, kind='stable')
+        sorted_pcts = pcts[order]
+        taken = np.zeros(len(order), dtype=bool)
+
+        chosen = []
         for target_percentile in percentiles:
-            df['distance'] = abs(df['percentile'] - target_percentile)
-            closest = df.loc[df['distance'].idxmin()]
+            k = self._nearest_available(sorted_pcts, order, taken, target_percentile)
+            taken[k] = True
+            chosen.append(order[k])
 
-            selected.append(closest['ticker'])
-            df = df[df['ticker'] != closest['ticker']]
+        selected = tickers[chosen].tolist()
+
+        levels = df['level'].to_numpy()
+        liquidity = df['liquidity'].to_numpy()
 
         print(f"\nSelected {num_tickers} tickers across percentiles:")
-        for i, ticker in enumerate(selected):
-            ticker_info = liquidity_df[liquidity_df['ticker'] == ticker].iloc[0]
-            print(f"  {i+1}. {ticker:12} | "
-                  f"P{ticker_info['percentile']:>5.1f} | "
-                  f"L{ticker_info['level']:>2.0f} | "
-                  f"${ticker_info['liquidity']:>15,.0f}")
+        for i, pos in enumerate(chosen):
+            print(f"  {i+1}. {tickers[pos]:12} | "
+                  f"P{pcts[pos]:>5.1f} | "
+                  f"L{levels[pos]:>2.0f} | "
+                  f"${liquidity[pos]:>15,.0f}")
 
         return selected
 
+    @staticmethod
+    def _nearest_available(
+        sorted_pcts: np.ndarray,
+        order: np.ndarray,
+        taken: np.ndarray,
+        target: float
+    ) -> int:
+        """
+        Find the position of the percentile closest to target that is not taken.
+
+        Among equally close candidates (tied percentiles, or a tie in
+        distance between the two sides) the one from the earliest row wins.
+
+        Args:
+            sorted_pcts: Percentiles in ascending order
+            order: Original row of each position (stable sort, so ascending within ties)
+            taken: Mask of positions already selected
+            target: Target percentile
+
+        Returns:
+            Position in sorted_pcts
+        """
+        start = int(np.searchsorted(sorted_pcts, target))
+
+        right = start
+        while right < len(sorted_pcts) and taken[right]:
+            right += 1
+
+        left = start - 1
+        while left >= 0 and taken[left]:
+            left -= 1
+
+        if left >= 0:
+            # Walk back to the first free position with the same percentile
+            left = int(np.searchsorted(sorted_pcts, sorted_pcts[left]))
+            while taken[left]:
+                left += 1
+
+        if left < 0:
+            return right
+        if right >= len(sorted_pcts):
+            return left
+
+        left_distance = abs(sorted_pcts[left] - target)
+        right_distance = abs(sorted_pcts[right] - target)
+
+        if left_distance < right_distance:
+            return left
+        if right_distance < left_distance:
+            return right
+        return left if order[left] < order[right] else right
+
     def get_ticker_info(self, liquidity_df: pd.DataFrame, ticker: str) -> Dict:
         """
         Get liquidity info for a specific ticker.
@@ -2,28 +2,82 @@
 Main pipeline for market data generation.
 """
 
+import zlib
+import multiprocessing
 import yfinance as yf
+import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 
 from .ticker_selector import IbovespaTickerFetcher
 from .liquidity_analyzer import LiquidityAnalyzer
 from .tick_generator import SyntheticTickGenerator
-from .data_organizer import DataOrganizer
+from .data_organizer import DataOrganizer, write_ticks
 from .b3_data_fetcher import B3HistoricalDataFetcher
+from .b3_calendar import B3_BUSINESS_DAY
+
+
+def generate_and_save(
+    tickers_dir: str,
+    ticker: str,
+    date_str: str,
+    ticker_data: pd.DataFrame,
+    b3_stats: Optional[Dict],
+    tick_config: Dict,
+    tick_format: str = 'csv'
+) -> int:
+    """
+    Generate and write tick data for one ticker on one date.
+
+    Runs in a worker process. The generator gets its own random stream,
+    spawned from the configured seed and keyed by the (ticker, date) pair,
+    so streams of different tasks are independent and output doesn't depend
+    on which worker picks the task or in what order.
+
+    Args:
+        tickers_dir: Base directory holding one folder per ticker
+        ticker: Ticker symbol
+        date_str: Date string YYYY-MM-DD
+        ticker_data: DataFrame with 1-minute OHLCV candles
+        b3_stats: Optional dict with B3 statistics for the ticker and date
+        tick_config: Config dict for SyntheticTickGenerator
+        tick_format: File format for tick data ('csv' or 'parquet')
+
+    Returns:
+        Number of ticks written
+    """
+    seed = tick_config.get('seed', 42)
+    task_seed = np.random.SeedSequence(
+        seed,
+        spawn_key=(zlib.crc32(ticker.encode()), int(date_str.replace("-", "")))
+    )
+
+    tick_generator = SyntheticTickGenerator(**{**tick_config, 'seed': task_seed})
+    ticks_df = tick_generator.generate_ticks(ticker_data, b3_stats)
+
+    if ticks_df.empty:
+        return 0
+
+    write_ticks(tickers_dir, ticker, date_str, ticks_df, tick_format)
+    return len(ticks_df)
 
 
 class MarketDataPipeline:
     """Orchestrates market data generation pipeline."""
 
+    MINUTE_BATCH_DAYS = 7
+
     def __init__(
         self,
         output_dir: str = "market_data",
         num_tickers: int = 9,
         days: int = 5,
         tick_config: Dict = None,
-        use_b3_stats: bool = True
+        use_b3_stats: bool = True,
+        max_workers: Optional[int] = None,
+        tick_format: str = "csv"
     ):
         """
         Initialize pipeline.
@@ -34,16 +88,20 @@ class MarketDataPipeline:
             days: Number of trading days to generate
             tick_config: Optional config dict for SyntheticTickGenerator
             use_b3_stats: Whether to use B3 COTAHIST data for realistic tick counts
+            max_workers: Number of worker processes for tick generation (default: CPU count)
+            tick_format: File format for tick data ('csv' or 'parquet')
         """
         self.output_dir = output_dir
         self.num_tickers = num_tickers
         self.days = days
         self.use_b3_stats = use_b3_stats
+        self.max_workers = max_workers
+        self.tick_config = tick_config or {}
 
         self.ticker_fetcher = IbovespaTickerFetcher()
         self.liquidity_analyzer = LiquidityAnalyzer(lookback_days=30)
-        self.tick_generator = SyntheticTickGenerator(**(tick_config or {}))
-        self.data_organizer = DataOrganizer(base_dir=output_dir)
+        self.tick_generator = SyntheticTickGenerator(**self.tick_config)
+        self.data_organizer = DataOrganizer(base_dir=output_dir, tick_format=tick_format)
         self.b3_fetcher = B3HistoricalDataFetcher() if use_b3_stats else None
 
     def run(self):
@@ -95,86 +153,160 @@ class MarketDataPipeline:
         return selected
 
     def _generate_and_save_data(self, tickers: List[str], liquidity_df: pd.DataFrame):
-        """Generate and save tick data for all selected tickers."""
+        """
+        Generate and save tick data for all selected tickers.
+
+        Minute data is downloaded in batches of consecutive dates (see
+        _batch_dates) in a background thread, while tick generation for
+        batches already downloaded runs in a process pool.
+        """
         print("\n[4/5] Generating tick data...")
 
         dates = self._get_date_range()
         total_tasks = len(tickers) * len(dates)
         completed = 0
 
-        for date_str in dates:
-            print(f"\nDownloading data for all tickers on {date_str}...")
+        tickers_dir = str(self.data_organizer.tickers_dir)
+        tickers_clean = {ticker: ticker.replace(".SA", "") for ticker in tickers}
+        b3_stats_by_key = self._get_b3_stats(list(tickers_clean.values()), dates)
+        tasks = {}
+
+        # Workers are spawned rather than forked: forking while the download
+        # thread (and yfinance's own threads) run can copy held locks into
+        # the child and deadlock it
+        with ThreadPoolExecutor(max_workers=1) as downloader, \
+                ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                ) as workers:
+            downloads = {
+                downloader.submit(self._download_bulk_minute_data, tickers, batch[0], batch[-1]): batch
+                for batch in self._batch_dates(dates)
+            }
 
-            bulk_data = self._download_bulk_minute_data(tickers, date_str)
+            for download in as_completed(downloads):
+                batch = downloads[download]
+                batch_data = download.result()
+                print(f"\nDownloaded data for all tickers from {batch[0]} to {batch[-1]}")
 
-            for ticker in tickers:
-                ticker_info = self.liquidity_analyzer.get_ticker_info(liquidity_df, ticker)
+                for date_str in batch:
+                    bulk_data = batch_data.loc[date_str:date_str]
 
-                try:
-                    ticks_df = self._generate_ticks_from_bulk(ticker, bulk_data, date_str)
+                    for ticker in tickers:
+                        ticker_data = self._extract_ticker_data(ticker, bulk_data)
+
+                        if ticker_data is None:
+                            completed += 1
+                            print(f"  {ticker:12} | {0:>6} ticks | Progress: {completed}/{total_tasks}")
+                            continue
 
-                    if ticks_df is not None and not ticks_df.empty:
-                        self.data_organizer.save_ticker_data(
+                        b3_stats = b3_stats_by_key.get((tickers_clean[ticker], date_str))
+
+                        task = workers.submit(
+                            generate_and_save,
+                            tickers_dir,
                             ticker,
                             date_str,
-                            ticks_df,
-                            ticker_info
+                            ticker_data,
+                            b3_stats,
+                            self.tick_config,
+                            self.data_organizer.tick_format
                         )
+                        tasks[task] = (ticker, date_str)
 
-                    completed += 1
-                    print(f"  {ticker:12} | {len(ticks_df) if ticks_df is not None else 0:>6} ticks | Progress: {completed}/{total_tasks}")
+            for task in as_completed(tasks):
+                ticker, date_str = tasks[task]
+                completed += 1
+
+                try:
+                    num_ticks = task.result()
+
+                    if num_ticks:
+                        ticker_info = self.liquidity_analyzer.get_ticker_info(liquidity_df, ticker)
+                        self.data_organizer.record_ticker_data(ticker, date_str, num_ticks, ticker_info)
+
+                    print(f"  {ticker:12} | {num_ticks:>6} ticks | Progress: {completed}/{total_tasks}")
 
                 except Exception as e:
                     print(f"  {ticker:12} | Error: {str(e)[:40]}")
-                    completed += 1
 
-    def _download_bulk_minute_data(self, tickers: List[str], date_str: str) -> pd.DataFrame:
+    def _batch_dates(self, dates: List[str]) -> List[List[str]]:
+        """
+        Group sorted dates into batches that fit one 1-minute download.
+
+        yfinance serves 1-minute candles in windows of at most
+        MINUTE_BATCH_DAYS calendar days per request.
+
+        Args:
+            dates: Sorted list of date strings YYYY-MM-DD
+
+        Returns:
+            List of batches, each a list of date strings
+        """
+        batches = []
+
+        for date_str in dates:
+            if batches and (pd.Timestamp(date_str) - pd.Timestamp(batches[-1][0])).days < self.MINUTE_BATCH_DAYS:
+                batches[-1].append(date_str)
+            else:
+                batches.append([date_str])
+
+        return batches
+
+    def _download_bulk_minute_data(
+        self,
+        tickers: List[str],
+        start_str: str,
+        end_str: str
+    ) -> pd.DataFrame:
         """
-        Download 1-minute data for all tickers on a specific date.
+        Download 1-minute data for all tickers over a range of dates.
 
         Args:
             tickers: List of ticker symbols
-            date_str: Date string YYYY-MM-DD
+            start_str: First date string YYYY-MM-DD
+            end_str: Last date string YYYY-MM-DD (inclusive)
 
         Returns:
             DataFrame with bulk downloaded data
         """
-        date = datetime.strptime(date_str, "%Y-%m-%d")
-        end_date = date + timedelta(days=1)
+        start_date = datetime.strptime(start_str, "%Y-%m-%d")
+        end_date = datetime.strptime(end_str, "%Y-%m-%d") + timedelta(days=1)
 
         bulk_data = yf.download(
             tickers,
-            start=date,
+            start=start_date,
             end=end_date,
             interval='1m',
             progress=False,
             group_by='ticker',
-            auto_adjust=True
+            auto_adjust=True,
+            threads=True
         )
 
         return bulk_data
 
-    def _generate_ticks_from_bulk(
+    def _extract_ticker_data(
         self,
         ticker: str,
-        bulk_data: pd.DataFrame,
-        date_str: str
-    ) -> pd.DataFrame:
+        bulk_data: pd.DataFrame
+    ) -> Optional[pd.DataFrame]:
         """
-        Generate tick data for a ticker from bulk downloaded data.
+        Get the 1-minute candles of a ticker from bulk downloaded data.
 
         Args:
             ticker: Ticker symbol
             bulk_data: DataFrame with bulk downloaded data
-            date_str: Date string YYYY-MM-DD
 
         Returns:
-            DataFrame with tick data or None if no data available
+            DataFrame with OHLCV candles or None if no data available
         """
         if bulk_data.empty:
             return None
 
-        if len(bulk_data.columns.levels[0]) > 1:
+        if isinstance(bulk_data.columns, pd.MultiIndex):
+            if ticker not in bulk_data.columns.get_level_values(0):
+                return None
             ticker_data = bulk_data[ticker]
         else:
             ticker_data = bulk_data
@@ -182,33 +314,43 @@ class MarketDataPipeline:
         if ticker_data.empty:
             return None
 
-        b3_stats = None
-        if self.b3_fetcher:
-            ticker_clean = ticker.replace(".SA", "")
-            b3_stats = self.b3_fetcher.get_ticker_stats(ticker_clean, date_str)
+        return ticker_data
 
-        return self.tick_generator.generate_ticks(ticker_data, b3_stats)
+    def _get_b3_stats(
+        self,
+        tickers_clean: List[str],
+        dates: List[str]
+    ) -> Dict[Tuple[str, str], Dict]:
+        """
+        Get B3 COTAHIST statistics for every ticker and date up front.
+
+        Args:
+            tickers_clean: Ticker symbols without .SA suffix
+            dates: Date strings YYYY-MM-DD
+
+        Returns:
+            Dict keyed by (ticker_clean, date), empty if B3 stats are disabled
+        """
+        if not self.b3_fetcher:
+            return {}
+
+        return self.b3_fetcher.get_bulk_ticker_stats(tickers_clean, dates)
 
     def _get_date_range(self) -> List[str]:
         """
         Get list of trading dates to generate.
 
+        The last `days` B3 sessions up to today, skipping weekends and
+        exchange holidays (yfinance returns no candles for those).
+
         Returns:
             List of date strings in format YYYY-MM-DD
         """
-        end_date = datetime.now()
-        dates = []
-
-        for i in range(self.days * 2):
-            check_date = end_date - timedelta(days=i)
-
-            if check_date.weekday() < 5:
-                dates.append(check_date.strftime("%Y-%m-%d"))
+        end_date = pd.Timestamp.now().normalize()
 
-            if len(dates) >= self.days:
-                break
+        dates = pd.date_range(end=end_date, periods=self.days, freq=B3_BUSINESS_DAY)
 
-        return sorted(dates)
+        return dates.strftime("%Y-%m-%d").tolist()
 
     def _finalize_metadata(self, tickers: List[str]):
         """Save final metadata."""
@@ -228,6 +370,8 @@ class MarketDataPipeline:
             }
         }
 
+        self.data_organizer.flush_ticker_infos()
+        self.data_organizer.flush_manifest()
         self.data_organizer.update_metadata(metadata)
         print("Metadata saved")
 
@@ -4,13 +4,115 @@ Synthetic tick data generation from OHLCV candles.
 
 import pandas as pd
 import numpy as np
-from datetime import timedelta, datetime, time
-from typing import Dict, Optional
+from functools import lru_cache
+from typing import Dict, Optional, Union
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+
+TICK_COLUMNS = ["timestamp", "bid", "ask", "trade_price", "volume", "side"]
+
+
+@lru_cache(maxsize=32)
+def _u_shape_base(num_minutes: int) -> np.ndarray:
+    """
+    Noise-free U-shape activity curve for a session of num_minutes.
+
+    Cached since sessions mostly share the same length; the returned
+    array is read-only.
+    """
+    normalized_time = np.arange(num_minutes) / num_minutes
+
+    # Opening and closing weights from one exp pass
+    edge_weights = 3.0 * np.exp(-10 * np.stack([normalized_time, 1 - normalized_time]))
+
+    midday_weight = 1.0
+
+    curve = edge_weights.sum(axis=0) + midday_weight
+    curve.flags.writeable = False
+    return curve
+
+
+@njit(cache=True)
+def _fill_ticks(
+    opens, highs, lows, closes, candle_volumes, counts, starts, trend_weight, excursion,
+    noise, spread_pct, side_draw, price_jitter, weights,
+    out_bid, out_ask, out_trade_price, out_volume, out_is_buy
+):
+    """
+    Fill per-tick output arrays candle by candle in a single fused pass.
+
+    Computes the same values as the NumPy path in SyntheticTickGenerator
+    from the same random draws, without materializing the intermediate
+    per-tick arrays. Outputs are written straight into the preallocated
+    (float32/int32) arrays. Only compiled when numba is installed.
+
+    Args:
+        opens, highs, lows, closes, candle_volumes: Per-candle OHLCV arrays
+        counts: Number of ticks of each candle
+        starts: Index of the first tick of each candle
+        trend_weight: Strength of trend from open to close
+        excursion: Midpath excursion as a fraction of the candle range
+        noise: Standard normal steps of the midpath random walk, one per tick
+        spread_pct: Spread draws as percentage of mid price, one per tick
+        side_draw: Uniform draws in [0, 1) deciding the side, one per tick
+        price_jitter: Trade price multipliers, one per tick
+        weights: Non-negative volume weights, one per tick
+        out_bid, out_ask, out_trade_price, out_volume, out_is_buy: Output arrays
+    """
+    walk = 0.0
+
+    for c in range(len(counts)):
+        n = counts[c]
+        start = starts[c]
+        move = closes[c] - opens[c]
+        denom = max(n - 1, 1)
+        step_scale = 2 * excursion * (highs[c] - lows[c]) / np.sqrt(n)
+        prob_buy = 0.55 if closes[c] > opens[c] else 0.45
+
+        # First pass: walk endpoints and volume weight of the candle
+        walk_start = walk + step_scale * noise[start]
+        walk_end = walk
+        segment_weight = 0.0
+        for k in range(n):
+            walk_end += step_scale * noise[start + k]
+            segment_weight += weights[start + k]
+        volume_scale = candle_volumes[c] / segment_weight
+
+        for k in range(n):
+            i = start + k
+            frac = k / denom
+
+            walk += step_scale * noise[i]
+            bridge = (walk - walk_start) - frac * (walk_end - walk_start)
+            mid = (opens[c] + move * frac) + trend_weight * move * frac + bridge
+            mid = min(max(mid, lows[c]), highs[c])
+
+            spread = mid * spread_pct[i]
+            bid = mid - spread / 2
+            ask = mid + spread / 2
+
+            is_buy = side_draw[i] < prob_buy
+            out_is_buy[i] = is_buy
+            out_bid[i] = bid
+            out_ask[i] = ask
+            out_trade_price[i] = (ask if is_buy else bid) * price_jitter[i]
+            out_volume[i] = int(weights[i] * volume_scale)
 
 
 class SyntheticTickGenerator:
     """Generates synthetic tick data from OHLCV candles."""
 
+    # Std of the midpath random walk halfway through a candle, as a fraction of High - Low
+    MIDPATH_EXCURSION = 0.125
+
     def __init__(
         self,
         ticks_per_min: int = 120,
@@ -18,7 +120,7 @@ class SyntheticTickGenerator:
         spread_vol: float = 0.0003,
         vol_noise: float = 0.4,
         trend_weight: float = 0.6,
-        seed: int = 42
+        seed: Union[int, np.random.SeedSequence] = 42
     ):
         """
         Initialize tick generator.
@@ -29,7 +131,7 @@ class SyntheticTickGenerator:
             spread_vol: Spread volatility
             vol_noise: Randomness of per-tick volume distribution
             trend_weight: Strength of trend from open to close
-            seed: Random seed for reproducibility
+            seed: Random seed (int or np.random.SeedSequence) for reproducibility
         """
         self.ticks_per_min = ticks_per_min
         self.spread_mean = spread_mean
@@ -38,7 +140,7 @@ class SyntheticTickGenerator:
         self.trend_weight = trend_weight
         self.seed = seed
 
-        np.random.seed(seed)
+        self.rng = np.random.default_rng(seed)
 
     def generate_ticks(
         self,
@@ -57,60 +159,152 @@ class SyntheticTickGenerator:
         """
         ohlcv_df = ohlcv_df.dropna(subset=["Open", "High", "Low", "Close", "Volume"])
 
-        if b3_stats and 'totneg' in b3_stats:
-            total_ticks_target = b3_stats['totneg']
-            tick_distribution = self._calculate_intraday_distribution(
-                len(ohlcv_df),
-                total_ticks_target
+        if ohlcv_df.empty:
+            return pd.DataFrame(columns=TICK_COLUMNS)
+
+        counts = self._ticks_per_minute(len(ohlcv_df), b3_stats)
+        starts = np.cumsum(counts) - counts
+        num_ticks = int(counts.sum())
+
+        opens = ohlcv_df["Open"].to_numpy(dtype=float)
+        highs = ohlcv_df["High"].to_numpy(dtype=float)
+        lows = ohlcv_df["Low"].to_numpy(dtype=float)
+        closes = ohlcv_df["Close"].to_numpy(dtype=float)
+        candle_volumes = ohlcv_df["Volume"].to_numpy(dtype=float)
+
+        if NUMBA_AVAILABLE:
+            bid, ask, trade_price, volumes, is_buy = self._build_ticks_numba(
+                opens, highs, lows, closes, candle_volumes, counts, starts
             )
         else:
-            tick_distribution = None
-
-        all_ticks = []
-        minute_idx = 0
-
-        for timestamp, row in ohlcv_df.iterrows():
-            if tick_distribution is not None:
-                num_ticks = max(1, int(tick_distribution[minute_idx]))
-                minute_idx += 1
-            else:
-                num_ticks = self.ticks_per_min
-
-            mid_prices = self._generate_midpath(row, num_ticks)
-            volumes = self._allocate_volumes(row["Volume"], num_ticks)
-
-            dt = timedelta(seconds=60 / num_ticks)
-
-            for i in range(num_ticks):
-                tick_timestamp = timestamp + i * dt
-                mid = mid_prices[i]
-                bid, ask = self._generate_spread(mid)
-
-                candle_is_bull = row["Close"] > row["Open"]
-                prob_buy = 0.55 if candle_is_bull else 0.45
-                side = np.random.choice(["buy", "sell"], p=[prob_buy, 1 - prob_buy])
-
-                if side == "buy":
-                    trade_price = ask * np.random.uniform(0.999, 1.001)
-                else:
-                    trade_price = bid * np.random.uniform(0.999, 1.001)
-
-                tick = {
-                    "timestamp": tick_timestamp,
-                    "bid": round(bid, 4),
-                    "ask": round(ask, 4),
-                    "trade_price": round(trade_price, 4),
-                    "volume": int(volumes[i]),
-                    "side": side
-                }
-                all_ticks.append(tick)
-
-        ticks_df = pd.DataFrame(all_ticks)
-        ticks_df.sort_values("timestamp", inplace=True)
-        ticks_df.reset_index(drop=True, inplace=True)
+            bid, ask, trade_price, volumes, is_buy = self._build_ticks(
+                opens, highs, lows, closes, candle_volumes, counts, starts
+            )
+
+        tick_in_candle = np.arange(num_ticks) - np.repeat(starts, counts)
+        step_us = np.repeat(np.round(60e6 / counts).astype(np.int64), counts)
+        timestamps = ohlcv_df.index.repeat(counts) + pd.to_timedelta(tick_in_candle * step_us, unit="us")
+
+        bid = bid.astype(np.float32, copy=False)
+        ask = ask.astype(np.float32, copy=False)
+        trade_price = trade_price.astype(np.float32, copy=False)
+        for prices in (bid, ask, trade_price):
+            np.round(prices, 4, out=prices)
+
+        ticks_df = pd.DataFrame({
+            "timestamp": timestamps,
+            "bid": bid,
+            "ask": ask,
+            "trade_price": trade_price,
+            "volume": volumes.astype(np.int32, copy=False),
+            "side": pd.Categorical.from_codes(is_buy.astype(np.int8), categories=["sell", "buy"])
+        })
 
         return ticks_df
 
+    def _build_ticks(
+        self,
+        opens: np.ndarray,
+        highs: np.ndarray,
+        lows: np.ndarray,
+        closes: np.ndarray,
+        candle_volumes: np.ndarray,
+        counts: np.ndarray,
+        starts: np.ndarray
+    ) -> tuple:
+        """
+        Generate per-tick prices, volumes and sides with NumPy array operations.
+
+        Args:
+            opens, highs, lows, closes, candle_volumes: Per-candle OHLCV arrays
+            counts: Number of ticks of each candle
+            starts: Index of the first tick of each candle
+
+        Returns:
+            Tuple of (bid, ask, trade_price, volume, is_buy) arrays
+        """
+        num_ticks = int(counts.sum())
+
+        mid_prices = self._generate_midpath(opens, closes, highs, lows, counts, starts)
+        bid, ask = self._generate_spread(mid_prices)
+
+        prob_buy = np.repeat(np.where(closes > opens, 0.55, 0.45), counts)
+        is_buy = self.rng.random(num_ticks) < prob_buy
+
+        trade_price = np.where(is_buy, ask, bid) * self.rng.uniform(0.999, 1.001, num_ticks)
+
+        volumes = self._allocate_volumes(candle_volumes, counts, starts)
+
+        return bid, ask, trade_price, volumes, is_buy
+
+    def _build_ticks_numba(
+        self,
+        opens: np.ndarray,
+        highs: np.ndarray,
+        lows: np.ndarray,
+        closes: np.ndarray,
+        candle_volumes: np.ndarray,
+        counts: np.ndarray,
+        starts: np.ndarray
+    ) -> tuple:
+        """
+        Generate per-tick prices, volumes and sides with the compiled kernel.
+
+        Random numbers are drawn here in the same order and with the same
+        distributions as _build_ticks, so both paths give the same ticks
+        for a given seed.
+
+        Args:
+            opens, highs, lows, closes, candle_volumes: Per-candle OHLCV arrays
+            counts: Number of ticks of each candle
+            starts: Index of the first tick of each candle
+
+        Returns:
+            Tuple of (bid, ask, trade_price, volume, is_buy) arrays
+        """
+        num_ticks = int(counts.sum())
+
+        noise = self.rng.standard_normal(num_ticks)
+        spread_pct = self.rng.normal(self.spread_mean, self.spread_vol, num_ticks)
+        side_draw = self.rng.random(num_ticks)
+        price_jitter = self.rng.uniform(0.999, 1.001, num_ticks)
+        weights = np.abs(self.rng.normal(1, self.vol_noise, num_ticks))
+
+        bid = np.empty(num_ticks, dtype=np.float32)
+        ask = np.empty(num_ticks, dtype=np.float32)
+        trade_price = np.empty(num_ticks, dtype=np.float32)
+        volumes = np.empty(num_ticks, dtype=np.int32)
+        is_buy = np.empty(num_ticks, dtype=np.bool_)
+
+        _fill_ticks(
+            opens, highs, lows, closes, candle_volumes, counts, starts,
+            self.trend_weight, self.MIDPATH_EXCURSION,
+            noise, spread_pct, side_draw, price_jitter, weights,
+            bid, ask, trade_price, volumes, is_buy
+        )
+
+        return bid, ask, trade_price, volumes, is_buy
+
+    def _ticks_per_minute(self, num_minutes: int, b3_stats: Optional[Dict]) -> np.ndarray:
+        """
+        Number of ticks to generate for each candle.
+
+        Args:
+            num_minutes: Number of candles
+            b3_stats: Optional dict with B3 statistics (totneg, quatot, etc)
+
+        Returns:
+            Integer array with at least one tick per candle
+        """
+        if b3_stats and 'totneg' in b3_stats:
+            tick_distribution = self._calculate_intraday_distribution(
+                num_minutes,
+                b3_stats['totneg']
+            )
+            return tick_distribution.astype(np.int64)
+
+        return np.full(num_minutes, self.ticks_per_min, dtype=np.int64)
+
     def _calculate_intraday_distribution(
         self,
         num_minutes: int,
@@ -126,88 +320,113 @@ class SyntheticTickGenerator:
         Returns:
             Array with number of ticks per minute
         """
-        minutes = np.arange(num_minutes)
-
-        u_curve = self._u_shape_curve(minutes, num_minutes)
+        u_curve = self._u_shape_curve(num_minutes)
 
         distribution = (u_curve / u_curve.sum()) * total_ticks
 
         return np.maximum(1, distribution)
 
-    def _u_shape_curve(self, minutes: np.ndarray, total_minutes: int) -> np.ndarray:
+    def _u_shape_curve(self, num_minutes: int) -> np.ndarray:
         """
         Generate U-shape curve for intraday trading activity.
 
         High activity at market open and close, lower in the middle.
 
         Args:
-            minutes: Array of minute indices
-            total_minutes: Total number of minutes
+            num_minutes: Total number of minutes
 
         Returns:
             Array of activity weights
         """
-        normalized_time = minutes / total_minutes
-
-        opening_weight = 3.0 * np.exp(-10 * normalized_time)
-
-        closing_weight = 3.0 * np.exp(-10 * (1 - normalized_time))
-
-        midday_weight = 1.0
-
-        curve = opening_weight + closing_weight + midday_weight
-
-        noise = np.random.normal(1.0, 0.1, len(minutes))
-        curve = curve * noise
+        noise = self.rng.normal(1.0, 0.1, num_minutes)
+        curve = _u_shape_base(num_minutes) * noise
 
         return np.maximum(0.1, curve)
 
-    def _generate_spread(self, mid_price: float) -> tuple:
+    def _generate_spread(self, mid_price: np.ndarray) -> tuple:
         """
-        Generate bid and ask prices around mid price.
+        Generate bid and ask prices around mid prices.
 
         Args:
-            mid_price: Mid market price
+            mid_price: Array of mid market prices
 
         Returns:
-            Tuple of (bid, ask)
+            Tuple of (bid, ask) arrays
         """
-        spread_pct = np.random.normal(self.spread_mean, self.spread_vol)
+        spread_pct = self.rng.normal(self.spread_mean, self.spread_vol, np.shape(mid_price))
         spread = mid_price * spread_pct
         bid = mid_price - spread / 2
         ask = mid_price + spread / 2
         return bid, ask
 
-    def _generate_midpath(self, row: pd.Series, num_ticks: int) -> np.ndarray:
+    def _generate_midpath(
+        self,
+        opens: np.ndarray,
+        closes: np.ndarray,
+        highs: np.ndarray,
+        lows: np.ndarray,
+        counts: np.ndarray,
+        starts: np.ndarray
+    ) -> np.ndarray:
         """
-        Generate random walk between open and close that respects OHLC.
+        Generate random walks between open and close that respect OHLC.
+
+        Each candle's walk is a Brownian bridge: one cumulative sum of random
+        steps over all ticks, detrended per candle so it starts and ends at
+        zero, added on top of the open to close trend. Step size scales with
+        the candle range so excursions mostly stay within High and Low;
+        the final bound only catches the tails.
 
         Args:
-            row: OHLCV candle row
-            num_ticks: Number of ticks to generate
+            opens: Open price of each candle
+            closes: Close price of each candle
+            highs: High price of each candle
+            lows: Low price of each candle
+            counts: Number of ticks of each candle
+            starts: Index of the first tick of each candle
 
         Returns:
             Array of mid prices for each tick
         """
-        start, end = row["Open"], row["Close"]
-        path = np.linspace(start, end, num_ticks)
-        noise = np.random.normal(0, (row["High"] - row["Low"]) / 200, num_ticks)
-        drift = self.trend_weight * (end - start) * np.linspace(0, 1, num_ticks)
-        mid = path + drift + noise
-        mid = np.clip(mid, row["Low"], row["High"])
+        num_ticks = int(counts.sum())
+
+        tick_in_candle = np.arange(num_ticks) - np.repeat(starts, counts)
+        frac = tick_in_candle / np.repeat(np.maximum(counts - 1, 1), counts)
+
+        start = np.repeat(opens, counts)
+        move = np.repeat(closes, counts) - start
+
+        step_scale = 2 * self.MIDPATH_EXCURSION * (highs - lows) / np.sqrt(counts)
+        walk = np.cumsum(np.repeat(step_scale, counts) * self.rng.standard_normal(num_ticks))
+        walk_start = np.repeat(walk[starts], counts)
+        walk_end = np.repeat(walk[starts + counts - 1], counts)
+        bridge = (walk - walk_start) - frac * (walk_end - walk_start)
+
+        path = start + move * frac
+        drift = self.trend_weight * move * frac
+        mid = path + drift + bridge
+        np.maximum(mid, np.repeat(lows, counts), out=mid)
+        np.minimum(mid, np.repeat(highs, counts), out=mid)
         return mid
 
-    def _allocate_volumes(self, total_volume: float, num_ticks: int) -> np.ndarray:
+    def _allocate_volumes(
+        self,
+        total_volumes: np.ndarray,
+        counts: np.ndarray,
+        starts: np.ndarray
+    ) -> np.ndarray:
         """
-        Randomly allocate total volume across ticks.
+        Randomly allocate each candle's volume across its ticks.
 
         Args:
-            total_volume: Total volume from candle
-            num_ticks: Number of ticks to allocate to
+            total_volumes: Total volume of each candle
+            counts: Number of ticks of each candle
+            starts: Index of the first tick of each candle
 
         Returns:
             Array of volumes for each tick
         """
-        weights = np.abs(np.random.normal(1, self.vol_noise, num_ticks))
-        weights /= weights.sum()
-        return (weights * total_volume).astype(int)
\ No newline at end of file
+        weights = np.abs(self.rng.normal(1, self.vol_noise, int(counts.sum())))
+        scale = total_volumes / np.add.reduceat(weights, starts)
+        weights *= np.repeat(scale, counts)
+        return weights.astype(np.int64)
@@ -3,7 +3,8 @@ Ticker selection and fetching utilities.
 """
 
 import yfinance as yf
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 import pandas as pd
 import os
 
@@ -56,16 +57,21 @@ class IbovespaTickerFetcher:
             return []
 
         try:
+            # Rows end with a trailing ';' that the header lacks; index_col=False
+            # keeps "Código" aligned with the ticker column instead of the index
             df = pd.read_csv(
                 IbovespaTickerFetcher.CSV_PATH,
                 sep=';',
                 encoding='latin-1',
                 skiprows=1,
+                index_col=False,
+                usecols=["Código", "Ação"],
             )
 
-            tickers = df["Código"].dropna().index.tolist()
+            # Footer rows (theoretical total, reducer) have no company name
+            codes = df.dropna(subset=["Ação"])["Código"].str.strip()
 
-            tickers = [f"{ticker.strip()}.SA" for ticker in tickers]
+            tickers = (codes + ".SA").tolist()
 
             return tickers
 
@@ -89,19 +95,37 @@ class IbovespaTickerFetcher:
 
         print(f"Validating {len(tickers)} tickers...")
 
-        for ticker in tickers:
-            try:
-                stock = yf.Ticker(ticker)
-                info = stock.info
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(IbovespaTickerFetcher._check_ticker, tickers)
 
-                if info and 'regularMarketPrice' in info or 'currentPrice' in info:
+            for ticker, reason in results:
+                if reason is None:
                     valid_tickers.append(ticker)
                     print(f"  OK {ticker}")
                 else:
-                    print(f"  SKIP {ticker} - no price data")
-
-            except Exception as e:
-                print(f"  SKIP {ticker} - {str(e)[:50]}")
+                    print(f"  SKIP {ticker} - {reason}")
 
         print(f"Validation complete: {len(valid_tickers)}/{len(tickers)} tickers valid")
-        return valid_tickers
\ No newline at end of file
+        return valid_tickers
+
+    @staticmethod
+    def _check_ticker(ticker: str) -> Tuple[str, Optional[str]]:
+        """
+        Check that a ticker has price data on yfinance.
+
+        Args:
+            ticker: Ticker symbol to check
+
+        Returns:
+            Tuple of (ticker, reason), where reason is None if the ticker is valid
+        """
+        try:
+            info = yf.Ticker(ticker).info
+
+            if info and ('regularMarketPrice' in info or 'currentPrice' in info):
+                return ticker, None
+
+            return ticker, "no price data"
+
+        except Exception as e:
+            return ticker, str(e)[:50]
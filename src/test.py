@@ -1,7 +1,7 @@
+import os
 import yfinance as yf
 import pandas as pd
 import numpy as np
-from datetime import timedelta
 
 def download_data():
 
@@ -34,7 +34,8 @@ period = "1d"
 interval = "1m"
 
 df = pd.read_csv(f"{ticker}-{period}-{interval}.csv", parse_dates=["Datetime"], index_col="Datetime")
-breakpoint()
+if os.getenv("DEBUG_TICKS"):
+    breakpoint()
 df = df.dropna(subset=["Open", "High", "Low", "Close", "Volume"])
 
 # ====================================================
@@ -43,20 +44,20 @@ df = df.dropna(subset=["Open", "High", "Low", "Close", "Volume"])
 
 def generate_spread(mid_price):
     """Return (bid, ask) given a mid price and random spread."""
-    spread_pct = np.random.normal(SPREAD_MEAN, SPREAD_VOL)
+    spread_pct = np.random.normal(SPREAD_MEAN, SPREAD_VOL, np.shape(mid_price))
     spread = mid_price * spread_pct
     bid = mid_price - spread / 2
     ask = mid_price + spread / 2
     return bid, ask
 
-def generate_midpath(row):
+def generate_midpath(open_, close, high, low, num_ticks):
     """Generate a random walk between open and close that respects OHLC."""
-    start, end = row["Open"], row["Close"]
-    path = np.linspace(start, end, TICKS_PER_MIN)
-    noise = np.random.normal(0, (row["High"] - row["Low"]) / 200, TICKS_PER_MIN)
-    drift = TREND_WEIGHT * (end - start) * np.linspace(0, 1, TICKS_PER_MIN)
+    path = np.linspace(open_, close, num_ticks)
+    noise = np.random.normal(0, (high - low) / 200, num_ticks)
+    drift = TREND_WEIGHT * (close - open_) * np.linspace(0, 1, num_ticks)
     mid = path + drift + noise
-    mid = np.clip(mid, row["Low"], row["High"])
+    np.maximum(mid, low, out=mid)
+    np.minimum(mid, high, out=mid)
     return mid
 
 def allocate_volumes(total_volume):
@@ -69,54 +70,66 @@ def allocate_volumes(total_volume):
 # 3. MAIN LOOP — GENERATE SYNTHETIC TICKS
 # ====================================================
 
-all_ticks = []
-
-for t, row in df.iterrows():
-    #breakpoint()
-    mid_prices = generate_midpath(row)
-    volumes = allocate_volumes(row["Volume"])
-
-    # Timestamp spacing
-    dt = timedelta(seconds=60 / TICKS_PER_MIN)
-
-    for i in range(TICKS_PER_MIN):
-        timestamp = t + i * dt
-        mid = mid_prices[i]
-        bid, ask = generate_spread(mid)
-
-        # Define side & trade price
-        candle_is_bull = row["Close"] > row["Open"]
-        prob_buy = 0.55 if candle_is_bull else 0.45
-        side = np.random.choice(["buy", "sell"], p=[prob_buy, 1 - prob_buy])
-
-        if side == "buy":
-            trade_price = ask * np.random.uniform(0.999, 1.001)
-        else:
-            trade_price = bid * np.random.uniform(0.999, 1.001)
-
-        tick = {
-            "timestamp": timestamp,
-            "bid": round(bid, 4),
-            "ask": round(ask, 4),
-            "trade_price": round(trade_price, 4),
-            "volume": int(volumes[i]),
-            "side": side
-        }
-        all_ticks.append(tick)
+opens = df["Open"].to_numpy()
+highs = df["High"].to_numpy()
+lows = df["Low"].to_numpy()
+closes = df["Close"].to_numpy()
+vols = df["Volume"].to_numpy()
+
+# Per-candle constants
+prob_buys = np.where(closes > opens, 0.55, 0.45)
+
+# Timestamp spacing: same offsets within every minute
+tick_offsets = np.arange(TICKS_PER_MIN) * np.timedelta64(round(60e6 / TICKS_PER_MIN), "us")
+
+# Output arrays, filled one candle slice at a time
+num_ticks = len(df) * TICKS_PER_MIN
+bid_arr = np.empty(num_ticks, dtype=np.float32)
+ask_arr = np.empty(num_ticks, dtype=np.float32)
+trade_price_arr = np.empty(num_ticks, dtype=np.float32)
+volume_arr = np.empty(num_ticks, dtype=np.int32)
+is_buy_arr = np.empty(num_ticks, dtype=np.bool_)
+
+for j in range(len(df)):
+    candle = slice(j * TICKS_PER_MIN, (j + 1) * TICKS_PER_MIN)
+    mid_prices = generate_midpath(opens[j], closes[j], highs[j], lows[j], TICKS_PER_MIN)
+    volumes = allocate_volumes(vols[j])
+
+    # Define side: one Bernoulli draw per tick
+    is_buy = np.random.random(TICKS_PER_MIN) < prob_buys[j]
+
+    bid, ask = generate_spread(mid_prices)
+
+    # Define trade price
+    trade_price = np.where(is_buy, ask, bid) * np.random.uniform(0.999, 1.001, TICKS_PER_MIN)
+
+    bid_arr[candle] = bid
+    ask_arr[candle] = ask
+    trade_price_arr[candle] = trade_price
+    volume_arr[candle] = volumes
+    is_buy_arr[candle] = is_buy
 
 # ====================================================
 # 4. BUILD FINAL DATAFRAME
 # ====================================================
 
-ticks_df = pd.DataFrame(all_ticks)
-ticks_df.sort_values("timestamp", inplace=True)
-ticks_df.reset_index(drop=True, inplace=True)
+for prices in (bid_arr, ask_arr, trade_price_arr):
+    np.round(prices, 4, out=prices)
+
+ticks_df = pd.DataFrame({
+    "timestamp": df.index.repeat(TICKS_PER_MIN) + np.tile(tick_offsets, len(df)),
+    "bid": bid_arr,
+    "ask": ask_arr,
+    "trade_price": trade_price_arr,
+    "volume": volume_arr,
+    "side": pd.Categorical.from_codes(is_buy_arr.astype(np.int8), categories=["sell", "buy"])
+})
 
 # ====================================================
-# 5. SAVE TO CSV
+# 5. SAVE TO PARQUET
 # ====================================================
 
-out_file = f"synthetic_ticks_{ticker}.csv"
-ticks_df.to_csv(out_file, index=False)
+out_file = f"synthetic_ticks_{ticker}.parquet"
+ticks_df.to_parquet(out_file, engine="pyarrow", compression="zstd", index=False)
 print(f"✅ Synthetic tick data saved to: {out_file}")
 print(ticks_df.head())